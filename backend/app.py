@@ -1,17 +1,25 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 import datetime
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 import os
 
-from backend.database import get_db, create_tables, seed_initial_data
-from backend import schemas
+from backend.database import (
+    ReadSessionLocal, engine, read_engine, writer_waits, get_db, get_read_db, create_tables, seed_initial_data
+)
+from backend import config, crud, schemas, security
+from backend.auth import Principal, create_access_token, get_current_user
+from backend.caching import conditional, reference_cache, stats_cache
+from backend.health import ReadinessProbe
+from backend.pagination import encode_cursor, decode_cursor
 from backend.database import (
     User, StudentProfile, EmployerProfile, Department,
-    Category, Skill, Job, Application, Notification
+    Category, Skill, Job, Application, Notification,
+    StatsCounters, STATS_COUNT_QUERIES, reconcile_stats
 )
 
 app = FastAPI(
@@ -23,6 +31,12 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+readiness = ReadinessProbe(
+    read_engine,
+    timeout=config.READINESS_TIMEOUT,
+    cache_seconds=config.READINESS_CACHE_SECONDS
+)
+
 FRONTEND_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
 
 if os.path.exists(FRONTEND_PATH):
@@ -53,9 +67,20 @@ def startup():
     finally:
         db.close()
 
+    db = ReadSessionLocal()
+    try:
+        reference_cache.warm(db)
+    finally:
+        db.close()
+
     print("🚀 Campus Jobs API запущен с базой данных!")
 
 
+@app.on_event("shutdown")
+def shutdown():
+    security.hashing_pool.shutdown()
+
+
 @app.get("/")
 def root():
     return {
@@ -71,85 +96,179 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/livez")
+def livez():
+    """Liveness: процесс жив и обрабатывает запросы (без обращения к БД)"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: соединение с БД доступно (проверка ограничена по времени и кешируется)"""
+    result = readiness.check()
+    if not result["ready"]:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "error": result["error"]})
+    return {"status": "ok"}
+
+
 @app.get("/api/v1/health")
-def api_health(db: Session = Depends(get_db)):
-    """Проверка здоровья API и БД"""
-    try:
-        db.execute("SELECT 1")
-        db_status = "connected"
-    except:
-        db_status = "disconnected"
+def api_health():
+    """Проверка здоровья API и БД (без подсчета строк, см. /api/v1/health/diagnostics)"""
+    result = readiness.check()
 
-    jobs_count = db.query(Job).count()
-    users_count = db.query(User).count()
+    return {
+        "status": "ok",
+        "database": "connected" if result["ready"] else "disconnected",
+        "timestamp": datetime.datetime.now().isoformat()
+    }
 
+
+@app.get("/api/v1/health/diagnostics")
+def api_health_diagnostics(db: Session = Depends(get_read_db)):
+    """Диагностика: точное число строк в основных таблицах (COUNT(*), дорого)"""
     return {
         "status": "ok",
-        "database": db_status,
+        "database": "connected" if readiness.check()["ready"] else "disconnected",
         "counts": {
-            "jobs": jobs_count,
-            "users": users_count
+            "jobs": db.query(Job).count(),
+            "users": db.query(User).count()
         },
+        "writer_pool": {"status": engine.pool.status(), **writer_waits.snapshot()},
         "timestamp": datetime.datetime.now().isoformat()
     }
 
 
-@app.get("/api/v1/jobs", response_model=List[schemas.JobResponse])
+# Таблицы, из которых строятся ответы ленты и карточек (для ETag)
+JOB_LIST_TABLES = ["jobs", "job_skill"]
+JOB_DETAIL_TABLES = ["jobs", "job_skill", "categories", "departments", "skills", "employer_profiles", "users"]
+
+
+@app.get("/api/v1/jobs", response_model=Union[List[schemas.JobResponse], schemas.JobPage])
 def get_jobs(
+        request: Request,
+        response: Response,
         skip: int = 0,
         limit: int = 100,
         active_only: bool = True,
         category_id: Optional[int] = None,
-        db: Session = Depends(get_db)
+        job_type: Optional[str] = None,
+        department_id: Optional[int] = None,
+        employer_id: Optional[int] = None,
+        skill_id: Optional[List[int]] = Query(None),
+        skill_match: str = Query("any", pattern="^(any|all)$"),
+        deadline_after: Optional[datetime.datetime] = None,
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        sort: str = Query("created", pattern="^(created|salary)$"),
+        cursor: Optional[str] = None,
+        db: Session = Depends(get_read_db)
 ):
-    """Получить список вакансий ИЗ БАЗЫ ДАННЫХ"""
-    query = db.query(Job)
+    """Получить список вакансий ИЗ БАЗЫ ДАННЫХ
+
+    Без cursor работает старая пагинация skip/limit и возвращается список.
+    С cursor (пустая строка - первая страница) возвращается страница
+    {items, next_cursor}; следующая страница запрашивается с cursor=next_cursor.
+    skill_id можно передать несколько раз, skill_match=any|all.
+    sort=salary сортирует по убыванию зарплаты (только вакансии с зарплатой).
+    """
+    not_modified = conditional(request, response, db, JOB_LIST_TABLES, request.url.query)
+    if not_modified:
+        return not_modified
+
+    query = crud.query_jobs(
+        db,
+        active_only=active_only,
+        category_id=category_id,
+        job_type=job_type,
+        department_id=department_id,
+        employer_id=employer_id,
+        skill_ids=skill_id,
+        skill_match=skill_match,
+        deadline_after=deadline_after,
+        salary_min=salary_min,
+        salary_max=salary_max,
+        sort=sort
+    )
 
-    if active_only:
-        query = query.filter(Job.is_active == True)
+    if cursor is None:
+        return query.offset(skip).limit(limit).all()
 
-    if category_id:
-        query = query.filter(Job.category_id == category_id)
+    if cursor:
+        sort_value, job_id = decode_cursor(cursor, 2)
+        query = crud.jobs_after(query, sort_value, job_id, sort=sort)
 
-    jobs = query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
+    rows = query.add_columns(crud.JOB_SORT_KEYS[sort]).limit(limit + 1).all()
 
-    return jobs
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_job, last_sort_value = rows[-1]
+        next_cursor = encode_cursor(last_sort_value, last_job.id)
 
+    return {"items": [job for job, _ in rows], "next_cursor": next_cursor}
 
-@app.get("/api/v1/jobs/{job_id}", response_model=schemas.JobDetailResponse)
-def get_job(job_id: int, db: Session = Depends(get_db)):
-    """Получить вакансию по ID ИЗ БАЗЫ ДАННЫХ"""
-    job = db.query(Job).filter(Job.id == job_id).first()
 
-    if not job:
-        raise HTTPException(status_code=404, detail="Вакансия не найдена")
+@app.get("/api/v1/jobs/search", response_model=List[schemas.JobSearchResult])
+def search_jobs(
+        q: str = Query(..., min_length=1, max_length=200),
+        limit: int = Query(20, ge=1, le=100),
+        active_only: bool = True,
+        db: Session = Depends(get_read_db)
+):
+    """Полнотекстовый поиск по названию, описанию и требованиям вакансий
 
-    result = {
-        "id": job.id,
-        "title": job.title,
-        "description": job.description,
-        "requirements": job.requirements,
-        "salary": job.salary,
-        "job_type": job.job_type,
-        "is_active": job.is_active,
-        "created_at": job.created_at,
-        "category_id": job.category_id,
-        "department_id": job.department_id,
-        "employer_id": job.employer_id
-    }
+    Каждое слово запроса ищется как префикс, результаты ранжируются по BM25,
+    snippet содержит фрагмент текста с совпадениями в <mark>.
+    """
+    results = []
+    for job, score, snippet in crud.search_jobs(db, q, limit=limit, active_only=active_only):
+        result = schemas.JobResponse.model_validate(job).model_dump()
+        result.update(score=score, snippet=snippet)
+        results.append(result)
+
+    return results
+
+
+JOB_DETAILS_MAX_IDS = 100
+
+
+@app.get("/api/v1/jobs/details", response_model=List[schemas.JobDetailResponse])
+def get_jobs_details(ids: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """Карточки нескольких вакансий: ids=1,2,3 (не больше JOB_DETAILS_MAX_IDS)
+
+    Число SQL-запросов не зависит от количества ids. Порядок ответа - как в ids,
+    несуществующие вакансии пропускаются.
+    """
+    try:
+        job_ids = list(dict.fromkeys(int(job_id) for job_id in ids.split(",") if job_id.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids должен быть списком чисел через запятую")
 
-    if job.category:
-        result["category"] = {"id": job.category.id, "name": job.category.name}
+    if not job_ids or len(job_ids) > JOB_DETAILS_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"Нужно от 1 до {JOB_DETAILS_MAX_IDS} ids")
 
-    if job.department:
-        result["department"] = {"id": job.department.id, "name": job.department.name}
+    not_modified = conditional(request, response, db, JOB_DETAIL_TABLES, *job_ids)
+    if not_modified:
+        return not_modified
 
-    if job.employer and job.employer.user:
-        result["employer"] = {"id": job.employer.id, "name": job.employer.user.full_name}
+    jobs = {job.id: job for job in crud.query_job_details(db).filter(Job.id.in_(job_ids))}
 
-    result["skills"] = [{"id": skill.id, "name": skill.name} for skill in job.skills]
+    return [crud.job_detail(jobs[job_id]) for job_id in job_ids if job_id in jobs]
 
-    return result
+
+@app.get("/api/v1/jobs/{job_id}", response_model=schemas.JobDetailResponse)
+def get_job(job_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """Получить вакансию по ID ИЗ БАЗЫ ДАННЫХ"""
+    not_modified = conditional(request, response, db, JOB_DETAIL_TABLES, job_id)
+    if not_modified:
+        return not_modified
+
+    job = crud.query_job_details(db).filter(Job.id == job_id).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Вакансия не найдена")
+
+    return crud.job_detail(job)
 
 
 @app.post("/api/v1/jobs", response_model=schemas.JobResponse)
@@ -163,52 +282,47 @@ def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/api/v1/categories", response_model=List[schemas.CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
-    """Получить список категорий ИЗ БАЗЫ ДАННЫХ"""
-    categories = db.query(Category).all()
-
-    if not categories:
-        categories = [
-            Category(name="Преподавание", description="Работа ассистентом"),
-            Category(name="Исследования", description="Научная работа"),
-            Category(name="Администрация", description="Административная работа")
-        ]
-        for cat in categories:
-            db.add(cat)
-        db.commit()
-        categories = db.query(Category).all()
-
-    return categories
+def get_categories(request: Request, db: Session = Depends(get_read_db)):
+    """Получить список категорий (из кеша справочников)"""
+    return reference_cache.respond(request, db, "categories")
 
 
 @app.get("/api/v1/departments", response_model=List[schemas.DepartmentResponse])
-def get_departments(db: Session = Depends(get_db)):
-    """Получить список отделов ИЗ БАЗЫ ДАННЫХ"""
-    return db.query(Department).all()
+def get_departments(request: Request, db: Session = Depends(get_read_db)):
+    """Получить список отделов (из кеша справочников)"""
+    return reference_cache.respond(request, db, "departments")
 
 
 @app.get("/api/v1/skills", response_model=List[schemas.SkillResponse])
-def get_skills(db: Session = Depends(get_db)):
-    """Получить список навыков"""
-    return db.query(Skill).all()
+def get_skills(request: Request, db: Session = Depends(get_read_db)):
+    """Получить список навыков (из кеша справочников)"""
+    return reference_cache.respond(request, db, "skills")
 
 
-from passlib.context import CryptContext
+def _find_user(db: Session, email: str) -> Optional[User]:
+    """Найти пользователя и завершить транзакцию чтения
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    Пока пароль хешируется, соединение возвращено в пул: иначе всплеск
+    логинов держит все соединения на время PBKDF2.
+    """
+    user = crud.get_user_by_email(db, email)
+    if user:
+        db.expunge(user)
+    db.rollback()
+    return user
 
 
 @app.post("/api/v1/auth/register", response_model=schemas.UserResponse)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    """Регистрация нового пользователя"""
-    existing_user = db.query(User).filter(User.email == user.email).first()
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    """Регистрация нового пользователя
+
+    Запросы к БД идут в пуле потоков, хеширование - в пуле процессов.
+    """
+    existing_user = await run_in_threadpool(_find_user, db, user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Пользователь уже существует")
 
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["pbkdf2_sha256", "plaintext"], deprecated="auto")
-
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await security.hash_password(user.password)
 
     db_user = User(
         email=user.email,
@@ -216,29 +330,44 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         full_name=user.full_name,
         user_type=user.user_type
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
 
-    return db_user
+    def save():
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        return schemas.UserResponse.model_validate(db_user)
+
+    return await run_in_threadpool(save)
 
 
 @app.post("/api/v1/auth/login")
-def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
-    """Вход в систему"""
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["pbkdf2_sha256", "plaintext"], deprecated="auto")
+async def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
+    """Вход в систему
 
-    user = db.query(User).filter(User.email == credentials.email).first()
+    Если пароль сохранен с устаревшими параметрами хеширования, хеш
+    прозрачно пересчитывается и сохраняется.
+    """
+    user = await run_in_threadpool(_find_user, db, credentials.email)
 
-    if not user or not pwd_context.verify(credentials.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await security.verify_password(credentials.password, user.hashed_password)
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль"
         )
 
+    if new_hash:
+        def rehash():
+            db.query(User).filter(User.id == user.id).update({"hashed_password": new_hash})
+            db.commit()
+
+        await run_in_threadpool(rehash)
+
     return {
-        "access_token": "demo-token-" + str(user.id),
+        "access_token": create_access_token(user.id, user.user_type),
         "token_type": "bearer",
         "user": {
             "id": user.id,
@@ -251,42 +380,45 @@ def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
 
 @app.get("/api/v1/applications")
 def get_applications(
-        db: Session = Depends(get_db)
+        user_id: Optional[int] = None,
+        job_id: Optional[int] = None,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        db: Session = Depends(get_read_db)
 ):
-    """Получить список заявок - УПРОЩЕННАЯ ВЕРСИЯ"""
+    """Получить список заявок с фильтрами
+
+    Вакансия и пользователь загружаются в том же запросе. Без cursor
+    возвращается список (skip/limit), с cursor - страница {items, next_cursor}.
+    """
     try:
-        applications = db.query(Application).all()
-
-        result = []
-        for app in applications:
-            app_data = {
-                "id": app.id,
-                "user_id": app.user_id,
-                "job_id": app.job_id,
-                "status": app.status,
-                "cover_letter": app.cover_letter,
-                "created_at": app.created_at
-            }
+        query = crud.query_applications(db, user_id=user_id, job_id=job_id, status=status)
 
-            if app.job:
-                app_data["job"] = {
-                    "id": app.job.id,
-                    "title": app.job.title,
-                    "salary": app.job.salary
-                }
+        if cursor is None:
+            applications = query.offset(skip).limit(limit).all()
+            return [crud.application_summary(application) for application in applications]
 
-            if app.user:
-                app_data["user"] = {
-                    "id": app.user.id,
-                    "email": app.user.email,
-                    "full_name": app.user.full_name,
-                    "user_type": app.user.user_type
-                }
+        if cursor:
+            created_raw, application_id = decode_cursor(cursor, 2)
+            query = crud.applications_after(query, created_raw, application_id)
 
-            result.append(app_data)
+        rows = query.add_columns(crud.APPLICATION_CREATED_RAW).limit(limit + 1).all()
 
-        return result
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_application, last_created_raw = rows[-1]
+            next_cursor = encode_cursor(last_created_raw, last_application.id)
 
+        return {
+            "items": [crud.application_summary(application) for application, _ in rows],
+            "next_cursor": next_cursor
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Ошибка при получении заявок: {e}")
         raise HTTPException(status_code=500, detail="Ошибка сервера")
@@ -295,20 +427,17 @@ def get_applications(
 @app.post("/api/v1/applications", response_model=schemas.ApplicationResponse)
 def create_application(
         application: schemas.ApplicationCreate,
+        current_user: Principal = Depends(get_current_user),
         db: Session = Depends(get_db),
 ):
-    """Создать заявку на вакансию"""
+    """Создать заявку на вакансию от имени пользователя из токена"""
     try:
         job = db.query(Job).filter(Job.id == application.job_id, Job.is_active == True).first()
         if not job:
             raise HTTPException(status_code=404, detail="Вакансия не найдена или неактивна")
 
-        test_user = db.query(User).filter(User.email == "student@university.edu").first()
-        if not test_user:
-            raise HTTPException(status_code=400, detail="Тестовый пользователь не найден")
-
         db_application = Application(
-            user_id=test_user.id,
+            user_id=current_user.id,
             job_id=application.job_id,
             cover_letter=application.cover_letter,
             status="pending"
@@ -347,18 +476,11 @@ def seed_database(db: Session = Depends(get_db)):
                 ]
             }
 
-        from passlib.context import CryptContext
-
-        pwd_context = CryptContext(
-            schemes=["pbkdf2_sha256", "plaintext"],
-            deprecated="auto"
-        )
-
         print("👤 Создаем тестовых пользователей...")
 
         student_user = User(
             email="student@university.edu",
-            hashed_password=pwd_context.hash("student123"),
+            hashed_password=security.pwd_context.hash("student123"),
             full_name="Иван Иванов",
             user_type="student"
         )
@@ -375,7 +497,7 @@ def seed_database(db: Session = Depends(get_db)):
 
         employer_user = User(
             email="employer@university.edu",
-            hashed_password=pwd_context.hash("employer123"),
+            hashed_password=security.pwd_context.hash("employer123"),
             full_name="Петр Петров",
             user_type="employer"
         )
@@ -469,19 +591,31 @@ def seed_database(db: Session = Depends(get_db)):
 
 
 @app.get("/api/v1/stats")
-def get_stats(db: Session = Depends(get_db)):
-    """Получить статистику системы"""
+def get_stats(db: Session = Depends(get_read_db)):
+    """Получить статистику системы
+
+    Счетчики читаются одной строкой из stats_counters (их ведут триггеры)
+    и кешируются на STATS_CACHE_TTL секунд.
+    """
+    def load():
+        counters = db.query(StatsCounters).filter(StatsCounters.id == 1).first()
+        if counters is None:
+            reconcile_stats(db)
+            counters = db.query(StatsCounters).filter(StatsCounters.id == 1).one()
+        return {counter: getattr(counters, counter) for counter in STATS_COUNT_QUERIES}
+
+    return {**stats_cache.get(db, "stats", load), "timestamp": datetime.datetime.now().isoformat()}
+
+
+@app.post("/api/v1/admin/stats/reconcile")
+def reconcile_stats_counters(db: Session = Depends(get_db)):
+    """Сверить счетчики статистики с реальным числом строк и исправить расхождения"""
+    drift = reconcile_stats(db)
+    stats_cache.clear()
+
     return {
-        "users": db.query(User).count(),
-        "students": db.query(StudentProfile).count(),
-        "employers": db.query(EmployerProfile).count(),
-        "jobs": db.query(Job).filter(Job.is_active == True).count(),
-        "applications": db.query(Application).count(),
-        "categories": db.query(Category).count(),
-        "departments": db.query(Department).count(),
-        "skills": db.query(Skill).count(),
-        "notifications": db.query(Notification).count(),
-        "timestamp": datetime.datetime.now().isoformat()
+        "success": True,
+        "drift": {counter: {"stored": stored, "actual": actual} for counter, (stored, actual) in drift.items()}
     }
 
 
@@ -0,0 +1,165 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend import config
+from backend.database import User, get_db
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode((data + "=" * (-len(data) % 4)).encode("ascii"))
+
+
+def _sign(body: str) -> str:
+    return _b64encode(hmac.new(config.SECRET_KEY.encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest())
+
+
+def create_access_token(user_id: int, user_type: str, ttl: int = None) -> str:
+    """Подписанный HMAC-SHA256 токен вида <payload>.<подпись>"""
+    payload = {
+        "sub": user_id,
+        "typ": user_type,
+        "exp": int(time.time()) + (ttl if ttl is not None else config.ACCESS_TOKEN_TTL_SECONDS)
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    return f"{body}.{_sign(body)}"
+
+
+def decode_access_token(token: str) -> dict:
+    """Проверка подписи и срока действия без обращения к БД"""
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Недействительный токен",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+    body, _, signature = token.partition(".")
+    if not body or not hmac.compare_digest(signature, _sign(body)):
+        raise invalid
+
+    try:
+        payload = json.loads(_b64decode(body))
+    except (ValueError, UnicodeError, binascii.Error):
+        raise invalid
+
+    if not isinstance(payload, dict) or payload.get("exp", 0) < time.time():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Срок действия токена истек",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    return payload
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    user_type: str
+    is_active: bool
+
+
+class PrincipalCache:
+    """LRU-кеш пользователей с TTL: запросы с токеном не читают users каждый раз"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Principal]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored_at, principal = item
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return principal
+
+    def put(self, key, principal: Principal):
+        with self._lock:
+            self._items[key] = (time.monotonic(), principal)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            for key in [key for key in self._items if key[1] == user_id]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+principal_cache = PrincipalCache(ttl=config.PRINCIPAL_CACHE_TTL, max_size=config.PRINCIPAL_CACHE_SIZE)
+
+
+def invalidate_principal(user_id: int):
+    """Сбросить закешированного пользователя (деактивация, смена роли, удаление)"""
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(User.is_active, "set")
+@event.listens_for(User.user_type, "set")
+def _user_changed(target, value, oldvalue, initiator):
+    if target.id is not None:
+        invalidate_principal(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    invalidate_principal(target.id)
+
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def get_current_user(
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+        db: Session = Depends(get_db)
+) -> Principal:
+    """Пользователь из токена Authorization: Bearer <token>"""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Требуется авторизация",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    payload = decode_access_token(credentials.credentials)
+    key = (str(db.get_bind().url), payload["sub"])
+
+    principal = principal_cache.get(key)
+    if principal is None:
+        row = db.query(User.id, User.user_type, User.is_active).filter(User.id == payload["sub"]).first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Пользователь не найден")
+        principal = Principal(id=row.id, user_type=row.user_type, is_active=bool(row.is_active))
+        principal_cache.put(key, principal)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Пользователь деактивирован")
+
+    return principal
@@ -0,0 +1,211 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend import auth, config, schemas
+from backend.database import Category, Department, Skill, TableVersion
+
+
+def table_validators(db: Session, tables: Iterable[str], *extra) -> Tuple[str, Optional[datetime]]:
+    """ETag и Last-Modified для ответа, построенного из таблиц tables
+
+    Читает только строки table_versions (один запрос по первичному ключу).
+    extra - параметры ответа (id, строка запроса), от которых зависит содержимое.
+    """
+    rows = db.execute(
+        select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.table_name.in_(list(tables)))
+        .order_by(TableVersion.table_name)
+    ).all()
+
+    token = ";".join(f"{row.table_name}:{row.version}" for row in rows)
+    token += "|" + "|".join(str(value) for value in extra)
+    etag = 'W/"' + hashlib.sha1(token.encode("utf-8")).hexdigest()[:24] + '"'
+
+    updated = [row.updated_at for row in rows if row.updated_at is not None]
+    last_modified = max(updated).replace(tzinfo=timezone.utc, microsecond=0) if updated else None
+
+    return etag, last_modified
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    # no-cache: браузер хранит ответ, но каждый раз перепроверяет его условным запросом
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Проверка If-None-Match / If-Modified-Since (If-None-Match имеет приоритет)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Слабое сравнение: W/"x" и "x" считаются одним тегом
+        opaque = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+
+    return False
+
+
+def conditional(request: Request, response: Response, db: Session, tables: Iterable[str], *extra):
+    """Ответ 304, если у клиента актуальная копия; иначе None и валидаторы в response
+
+    Использование в эндпоинте:
+        not_modified = conditional(request, response, db, ["jobs"], job_id)
+        if not_modified:
+            return not_modified
+    """
+    etag, last_modified = table_validators(db, tables, *extra)
+    headers = validator_headers(etag, last_modified)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+class TTLCache:
+    """Значения в памяти процесса на ttl секунд (ключ включает URL БД)"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values = {}
+
+    def get(self, db: Session, key: str, load: Callable[[], object]):
+        cache_key = (str(db.get_bind().url), key)
+        cached = self._values.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        value = load()
+        self._values[cache_key] = (time.monotonic(), value)
+        return value
+
+    def clear(self):
+        self._values.clear()
+
+
+@dataclass
+class ReferenceEntry:
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    checked_at: float
+
+
+class ReferenceCache:
+    """Кеш справочников в памяти процесса: готовые JSON-байты и валидаторы
+
+    Запись справочника в этом процессе сразу помечает его устаревшим (события
+    ORM). Записи из других воркеров обнаруживаются сверкой с table_versions
+    не чаще раза в revalidate_seconds - между сверками SQLite не используется.
+    """
+
+    KINDS = {
+        "categories": (Category, TypeAdapter(List[schemas.CategoryResponse])),
+        "departments": (Department, TypeAdapter(List[schemas.DepartmentResponse])),
+        "skills": (Skill, TypeAdapter(List[schemas.SkillResponse])),
+    }
+
+    def __init__(self, max_age: int, revalidate_seconds: float):
+        self.max_age = max_age
+        self.revalidate_seconds = revalidate_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, kind: str) -> ReferenceEntry:
+        key = (str(db.get_bind().url), kind)
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry.checked_at < self.revalidate_seconds:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry.checked_at < self.revalidate_seconds:
+                return entry
+
+            etag, last_modified = table_validators(db, [kind])
+            if entry and entry.etag == etag:
+                entry.checked_at = time.monotonic()
+                return entry
+
+            model, adapter = self.KINDS[kind]
+            rows = db.query(model).order_by(model.id).all()
+            entry = ReferenceEntry(
+                body=adapter.dump_json(rows),
+                etag=etag,
+                last_modified=last_modified,
+                checked_at=time.monotonic()
+            )
+            self._entries[key] = entry
+            return entry
+
+    def respond(self, request: Request, db: Session, kind: str) -> Response:
+        entry = self.get(db, kind)
+        headers = validator_headers(entry.etag, entry.last_modified)
+        headers["Cache-Control"] = f"public, max-age={self.max_age}"
+
+        if is_not_modified(request, entry.etag, entry.last_modified):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def warm(self, db: Session):
+        for kind in self.KINDS:
+            self.get(db, kind)
+
+    def invalidate(self, kind: str = None):
+        with self._lock:
+            for key in list(self._entries):
+                if kind is None or key[1] == kind:
+                    del self._entries[key]
+
+    def clear(self):
+        self.invalidate()
+
+
+reference_cache = ReferenceCache(
+    max_age=config.REFERENCE_CACHE_MAX_AGE,
+    revalidate_seconds=config.REFERENCE_CACHE_REVALIDATE_SECONDS
+)
+
+
+def _invalidate_reference(mapper, connection, target):
+    reference_cache.invalidate(target.__tablename__)
+
+
+stats_cache = TTLCache(ttl=config.STATS_CACHE_TTL)
+
+
+def clear_all():
+    """Сбросить все кеши процесса (тесты пересоздают БД)"""
+    reference_cache.clear()
+    stats_cache.clear()
+    auth.principal_cache.clear()
+
+
+for _model, _ in ReferenceCache.KINDS.values():
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _invalidate_reference)
@@ -0,0 +1,41 @@
+import os
+
+
+# Кеш справочников (категории, отделы, навыки)
+REFERENCE_CACHE_MAX_AGE = int(os.getenv("REFERENCE_CACHE_MAX_AGE", "300"))
+REFERENCE_CACHE_REVALIDATE_SECONDS = float(os.getenv("REFERENCE_CACHE_REVALIDATE_SECONDS", "30"))
+
+# /api/v1/stats: сколько секунд отдавать счетчики без обращения к БД
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "5"))
+
+# /readyz: предел ожидания проверки соединения и время кеширования результата
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "1.0"))
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "2.0"))
+
+# Хеширование паролей: число итераций PBKDF2 (при изменении старые хеши
+# пересчитываются при следующем входе), размер пула процессов (0 - хешировать
+# в пуле потоков) и предел одновременных операций, сверх которого отвечаем 503
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(os.cpu_count() or 1)))
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", str(8 * (os.cpu_count() or 1))))
+
+# Токены доступа: ключ подписи HMAC (обязательно задать в продакшене, общий
+# для всех воркеров), срок жизни токена и кеш пользователей по токену
+SECRET_KEY = os.getenv("SECRET_KEY", "campus-jobs-dev-secret-change-me")
+ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", str(12 * 3600)))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+# База данных: URL, профиль SQLite (применяется к каждому новому соединению)
+# и размеры пула читателей (писатель всегда один, см. database.engine)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./campus_jobs.db")
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
@@ -1,5 +1,22 @@
-from sqlalchemy.orm import Session
-from .database import User, Job, Application, Category, Department
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import String, column, func, literal_column, or_, select, table, type_coerce
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from .security import pwd_context
+from .database import User, Job, Application, Category, Department, EmployerProfile, job_skill_association
+
+# created_at в том виде, в котором он хранится в SQLite (без преобразования в datetime).
+# Курсор сравнивается с сырым значением, иначе строки '... 10:00:00' и
+# '... 10:00:00.000000' считаются разными и пагинация теряет или дублирует записи.
+JOB_CREATED_RAW = type_coerce(Job.created_at, String)
+
+# Ключи сортировки ленты; порядок всегда (ключ DESC, id) - как в индексах jobs
+JOB_SORT_KEYS = {
+    "created": JOB_CREATED_RAW,
+    "salary": Job.salary_min,
+}
 
 
 def get_user_by_email(db: Session, email: str):
@@ -7,9 +24,6 @@ def get_user_by_email(db: Session, email: str):
 
 
 def create_user(db: Session, email: str, password: str, full_name: str, user_type: str):
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["pbkdf2_sha256", "plaintext"], deprecated="auto")
-
     hashed_password = pwd_context.hash(password)
 
     user = User(
@@ -29,10 +43,225 @@ def get_jobs(db: Session, skip: int = 0, limit: int = 100):
     return db.query(Job).filter(Job.is_active == True).offset(skip).limit(limit).all()
 
 
+def query_jobs(
+        db: Session,
+        active_only: bool = True,
+        category_id: Optional[int] = None,
+        job_type: Optional[str] = None,
+        department_id: Optional[int] = None,
+        employer_id: Optional[int] = None,
+        skill_ids: Optional[List[int]] = None,
+        skill_match: str = "any",
+        deadline_after: Optional[datetime] = None,
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        sort: str = "created"
+):
+    """Запрос ленты вакансий с фильтрами, упорядоченный по (ключ sort DESC, id)
+
+    skill_match="any" - вакансия требует хотя бы один из skill_ids,
+    skill_match="all" - вакансия требует все skill_ids.
+    salary_min - нижняя граница зарплаты не меньше, salary_max - верхняя не больше.
+    sort="salary" - по убыванию salary_min, вакансии без зарплаты не попадают.
+    """
+    query = db.query(Job)
+
+    if active_only:
+        query = query.filter(Job.is_active == True)
+
+    if category_id:
+        query = query.filter(Job.category_id == category_id)
+
+    if job_type:
+        query = query.filter(Job.job_type == job_type)
+
+    if department_id:
+        query = query.filter(Job.department_id == department_id)
+
+    if employer_id:
+        query = query.filter(Job.employer_id == employer_id)
+
+    if skill_ids:
+        skill_ids = set(skill_ids)
+        job_ids = select(job_skill_association.c.job_id).where(
+            job_skill_association.c.skill_id.in_(skill_ids)
+        )
+        if skill_match == "all":
+            job_ids = job_ids.group_by(job_skill_association.c.job_id).having(
+                func.count(job_skill_association.c.skill_id) == len(skill_ids)
+            )
+        query = query.filter(Job.id.in_(job_ids))
+
+    if deadline_after:
+        query = query.filter(Job.deadline >= deadline_after)
+
+    if salary_min is not None:
+        query = query.filter(Job.salary_min >= salary_min)
+
+    if salary_max is not None:
+        query = query.filter(Job.salary_max <= salary_max)
+
+    if sort == "salary":
+        return query.filter(Job.salary_min.isnot(None)).order_by(Job.salary_min.desc(), Job.id)
+
+    return query.order_by(Job.created_at.desc(), Job.id)
+
+
+def jobs_after(query, sort_value, job_id: int, sort: str = "created"):
+    """Keyset-условие: вакансии, идущие в ленте после (sort_value, job_id)"""
+    key = JOB_SORT_KEYS[sort]
+    return query.filter(key <= sort_value, or_(key < sort_value, Job.id > job_id))
+
+
+jobs_fts = table("jobs_fts", column("rowid"))
+
+SEARCH_MAX_TERMS = 10
+
+
+def fts_query(q: str) -> str:
+    """Пользовательский запрос -> выражение FTS5: все слова, каждое как префикс"""
+    terms = re.findall(r"\w+", q)[:SEARCH_MAX_TERMS]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_jobs(db: Session, q: str, limit: int = 20, active_only: bool = True):
+    """Полнотекстовый поиск вакансий: [(Job, score, snippet)], лучшие первыми"""
+    match = fts_query(q)
+    if not match:
+        return []
+
+    fts = literal_column("jobs_fts")
+    snippet = func.snippet(fts, -1, "<mark>", "</mark>", "…", 12)
+    query = (
+        db.query(Job, -literal_column("jobs_fts.rank"), snippet)
+        .select_from(jobs_fts)
+        .join(Job, Job.id == jobs_fts.c.rowid)
+        .filter(fts.match(match))
+    )
+
+    if active_only:
+        query = query.filter(Job.is_active == True)
+
+    # ORDER BY rank + LIMIT FTS5 выполняет внутри модуля, не сортируя все совпадения
+    return query.order_by(literal_column("jobs_fts.rank")).limit(limit).all()
+
+
 def get_job_by_id(db: Session, job_id: int):
     return db.query(Job).filter(Job.id == job_id).first()
 
 
+def query_job_details(db: Session):
+    """Вакансии со всеми связями для карточки: 2 запроса на любое число вакансий
+
+    Связи "к одному" приходят JOIN-ом в основном запросе, навыки - одним
+    SELECT ... WHERE job_id IN (...).
+    """
+    return db.query(Job).options(
+        joinedload(Job.category),
+        joinedload(Job.department),
+        joinedload(Job.employer).joinedload(EmployerProfile.user),
+        selectinload(Job.skills)
+    )
+
+
+def job_detail(job: Job) -> dict:
+    """Ответ карточки вакансии (JobDetailResponse) из загруженной вакансии"""
+    result = {
+        "id": job.id,
+        "title": job.title,
+        "description": job.description,
+        "requirements": job.requirements,
+        "salary": job.salary,
+        "job_type": job.job_type,
+        "is_active": job.is_active,
+        "created_at": job.created_at,
+        "category_id": job.category_id,
+        "department_id": job.department_id,
+        "employer_id": job.employer_id
+    }
+
+    if job.category:
+        result["category"] = {"id": job.category.id, "name": job.category.name}
+
+    if job.department:
+        result["department"] = {"id": job.department.id, "name": job.department.name}
+
+    if job.employer and job.employer.user:
+        result["employer"] = {"id": job.employer.id, "name": job.employer.user.full_name}
+
+    result["skills"] = [{"id": skill.id, "name": skill.name} for skill in job.skills]
+
+    return result
+
+
+APPLICATION_CREATED_RAW = type_coerce(Application.created_at, String)
+
+
+def query_applications(
+        db: Session,
+        user_id: Optional[int] = None,
+        job_id: Optional[int] = None,
+        status: Optional[str] = None
+):
+    """Заявки с краткими данными вакансии и пользователя одним запросом
+
+    Порядок (created_at DESC, id DESC) совпадает с обратным обходом индексов
+    applications(user_id, created_at) и applications(created_at).
+    """
+    query = db.query(Application).options(
+        joinedload(Application.job).load_only(Job.id, Job.title, Job.salary),
+        joinedload(Application.user).load_only(User.id, User.email, User.full_name, User.user_type)
+    )
+
+    if user_id:
+        query = query.filter(Application.user_id == user_id)
+
+    if job_id:
+        query = query.filter(Application.job_id == job_id)
+
+    if status:
+        query = query.filter(Application.status == status)
+
+    return query.order_by(Application.created_at.desc(), Application.id.desc())
+
+
+def applications_after(query, created_raw: str, application_id: int):
+    """Keyset-условие: заявки, идущие в списке после (created_raw, application_id)"""
+    return query.filter(
+        APPLICATION_CREATED_RAW <= created_raw,
+        or_(APPLICATION_CREATED_RAW < created_raw, Application.id < application_id)
+    )
+
+
+def application_summary(application: Application) -> dict:
+    """Заявка с краткими данными вакансии и пользователя для списков"""
+    result = {
+        "id": application.id,
+        "user_id": application.user_id,
+        "job_id": application.job_id,
+        "status": application.status,
+        "cover_letter": application.cover_letter,
+        "created_at": application.created_at
+    }
+
+    if application.job:
+        result["job"] = {
+            "id": application.job.id,
+            "title": application.job.title,
+            "salary": application.job.salary
+        }
+
+    if application.user:
+        result["user"] = {
+            "id": application.user.id,
+            "email": application.user.email,
+            "full_name": application.user.full_name,
+            "user_type": application.user.user_type
+        }
+
+    return result
+
+
 def create_application(db: Session, user_id: int, job_id: int, cover_letter: str = ""):
     application = Application(
         user_id=user_id,
@@ -1,17 +1,101 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, Boolean, DateTime, Table
+import threading
+import time
+
+from sqlalchemy import (
+    create_engine, event, inspect, select, text, update, bindparam,
+    Column, Integer, String, ForeignKey, Text, Boolean, DateTime, Table, Index
+)
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, validates
 from sqlalchemy.sql import func
 
-
-DATABASE_URL = "sqlite:///./campus_jobs.db"
-
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+from backend import config
+from backend.salary import parse_salary
+
+
+DATABASE_URL = config.DATABASE_URL
+
+# Профиль SQLite: WAL (читатели не блокируют писателя), synchronous=NORMAL
+# (в режиме WAL не теряет целостность), кеш страниц и mmap, временные таблицы
+# в памяти, ожидание блокировки вместо мгновенного "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": config.SQLITE_JOURNAL_MODE,
+    "synchronous": config.SQLITE_SYNCHRONOUS,
+    "cache_size": -config.SQLITE_CACHE_SIZE_KB,
+    "mmap_size": config.SQLITE_MMAP_SIZE,
+    "temp_store": config.SQLITE_TEMP_STORE,
+    "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+}
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict):
+    """Выполнять PRAGMA на каждом новом соединении пула"""
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+# Соединения читателей: mode=ro на уровне файла и query_only на уровне
+# соединения; journal_mode не трогаем - его выставляет писатель
+SQLITE_READ_PRAGMAS = {
+    **{name: value for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"},
+    "query_only": "ON",
+}
+
+
+def read_only_url(url: str) -> str:
+    """URL того же файла SQLite, открываемого только на чтение"""
+    parsed = make_url(url)
+    if not url.startswith("sqlite") or not parsed.database or parsed.database == ":memory:":
+        return url
+    if parsed.database.startswith("file:"):
+        return url
+    return str(parsed.set(database=f"file:{parsed.database}", query={**parsed.query, "mode": "ro", "uri": "true"}))
+
+
+def make_engine(url: str = DATABASE_URL, pragmas: dict = None, **pool_options):
+    """Движок с профилем SQLite и параметрами пула из конфигурации"""
+    options = {}
+    if url.startswith("sqlite") and ":memory:" not in url:
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+    options.update(pool_options)
+
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_pre_ping=True, **options)
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        **options
+    )
+    apply_sqlite_pragmas(engine, SQLITE_PRAGMAS if pragmas is None else pragmas)
+    return engine
+
+
+def make_read_engine(url: str = DATABASE_URL, **pool_options):
+    """Пул соединений только для чтения (в WAL читатели не ждут писателя)"""
+    return make_engine(read_only_url(url), pragmas=SQLITE_READ_PRAGMAS, **pool_options)
+
+
+# Писатель - одно соединение: SQLite все равно допускает одну пишущую
+# транзакцию, а очередь к пулу вместо "database is locked" видна в метриках
+engine = make_engine(pool_size=1, max_overflow=0)
+read_engine = make_read_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -19,7 +103,9 @@ job_skill_association = Table(
     'job_skill',
     Base.metadata,
     Column('job_id', Integer, ForeignKey('jobs.id'), primary_key=True),
-    Column('skill_id', Integer, ForeignKey('skills.id'), primary_key=True)
+    Column('skill_id', Integer, ForeignKey('skills.id'), primary_key=True),
+    # Первичный ключ (job_id, skill_id) не помогает искать вакансии по навыку
+    Index('ix_job_skill_skill_job', 'skill_id', 'job_id')
 )
 
 
@@ -114,6 +200,11 @@ class Job(Base):
     description = Column(Text, nullable=False)
     requirements = Column(Text)
     salary = Column(String(50))
+    # Разобранная зарплата (заполняется из salary, см. parse_salary)
+    salary_min = Column(Integer)
+    salary_max = Column(Integer)
+    salary_period = Column(String(10))  # hour, day, week, month, year
+    currency = Column(String(3))  # RUB, USD, EUR
     job_type = Column(String(30))
     category_id = Column(Integer, ForeignKey("categories.id"))
     department_id = Column(Integer, ForeignKey("departments.id"))
@@ -122,12 +213,33 @@ class Job(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     deadline = Column(DateTime(timezone=True))
 
+    __table_args__ = (
+        # Курсорная пагинация ленты: WHERE is_active = 1 ORDER BY created_at DESC, id
+        Index("ix_jobs_active_created_id", is_active, created_at.desc(), id),
+        Index("ix_jobs_created_id", created_at.desc(), id),
+        # Фильтры ленты: равенство по полю + та же сортировка
+        Index("ix_jobs_active_category_created", is_active, category_id, created_at.desc(), id),
+        Index("ix_jobs_active_type_created", is_active, job_type, created_at.desc(), id),
+        Index("ix_jobs_active_department_created", is_active, department_id, created_at.desc(), id),
+        Index("ix_jobs_employer_active_created", employer_id, is_active, created_at.desc(), id),
+        Index("ix_jobs_active_deadline", is_active, deadline),
+        # "Зарплата от X" и сортировка по зарплате - диапазон по индексу
+        Index("ix_jobs_active_salary_min", is_active, salary_min.desc(), id),
+        Index("ix_jobs_active_salary_max", is_active, salary_max),
+    )
+
     category = relationship("Category", back_populates="jobs")
     department = relationship("Department", back_populates="jobs")
     employer = relationship("EmployerProfile", back_populates="jobs")
     applications = relationship("Application", back_populates="job")
     skills = relationship("Skill", secondary=job_skill_association, back_populates="jobs")
 
+    @validates("salary")
+    def _parse_salary(self, key, value):
+        for column, parsed in parse_salary(value).items():
+            setattr(self, column, parsed)
+        return value
+
 
 class Application(Base):
     """8. Заявка на вакансию"""
@@ -141,6 +253,13 @@ class Application(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Заявки студента (личный кабинет) и заявки на вакансию по статусу
+        Index("ix_applications_user_created", user_id, created_at),
+        Index("ix_applications_job_status", job_id, status),
+        Index("ix_applications_created", created_at),
+    )
+
     user = relationship("User", back_populates="applications")
     job = relationship("Job", back_populates="applications")
 
@@ -168,26 +287,364 @@ class ApplicationStatus(Base):
     description = Column(Text)
 
 
+# Полнотекстовый индекс вакансий. External content: текст хранится только в jobs,
+# jobs_fts содержит лишь инвертированный индекс и обновляется триггерами построчно.
+JOBS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description, requirements,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description, requirements ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+        INSERT INTO jobs_fts(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END
+    """,
+    # Ранжирование BM25: совпадение в названии весит больше, чем в описании
+    "INSERT INTO jobs_fts(jobs_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 2.0)')",
+]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    """Создание FTS5-индекса вакансий (в том числе для уже существующей БД)"""
+    if connection.dialect.name != "sqlite":
+        return
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+    ).first()
+
+    for ddl in JOBS_FTS_DDL:
+        connection.exec_driver_sql(ddl)
+
+    if not exists:
+        # Разовое построение индекса по вакансиям, созданным до появления поиска
+        connection.exec_driver_sql("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS jobs_fts")
+
+
+DEFAULT_CATEGORIES = [
+    {"name": "Преподавание", "description": "Работа ассистентом преподавателя"},
+    {"name": "Исследования", "description": "Научно-исследовательская работа"},
+    {"name": "Администрация", "description": "Административная работа"},
+    {"name": "IT", "description": "IT-специальности"},
+    {"name": "Библиотека", "description": "Работа в библиотеке"}
+]
+
+
+@event.listens_for(Category.__table__, "after_create")
+def create_default_categories(target, connection, **kw):
+    """Категории по умолчанию создаются вместе с таблицей, а не при чтении"""
+    connection.execute(target.insert(), DEFAULT_CATEGORIES)
+
+
+class TableVersion(Base):
+    """Версии таблиц для HTTP-валидаторов (ETag/Last-Modified)"""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Изменения, после которых устаревают ответы API на чтение. Версии увеличивают
+# триггеры в той же транзакции, что и само изменение, поэтому их видят все воркеры.
+# Для users важно только имя (оно показывается в карточке вакансии у работодателя).
+VERSIONED_TABLES = {
+    "jobs": ["INSERT", "UPDATE", "DELETE"],
+    "job_skill": ["INSERT", "UPDATE", "DELETE"],
+    "categories": ["INSERT", "UPDATE", "DELETE"],
+    "departments": ["INSERT", "UPDATE", "DELETE"],
+    "skills": ["INSERT", "UPDATE", "DELETE"],
+    "employer_profiles": ["INSERT", "UPDATE", "DELETE"],
+    "users": ["UPDATE OF full_name", "DELETE"],
+}
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_version_triggers(target, connection, **kw):
+    """Строки table_versions и триггеры, увеличивающие версию при записи"""
+    if connection.dialect.name != "sqlite":
+        return
+
+    for table_name, operations in VERSIONED_TABLES.items():
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO table_versions (table_name, version, updated_at) "
+            "VALUES (?, 0, CURRENT_TIMESTAMP)",
+            (table_name,)
+        )
+        for operation in operations:
+            trigger_name = f"{table_name}_version_{operation.split()[0].lower()}"
+            connection.exec_driver_sql(f"""
+                CREATE TRIGGER IF NOT EXISTS {trigger_name} AFTER {operation} ON {table_name} BEGIN
+                    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE table_name = '{table_name}';
+                END
+            """)
+
+
+class StatsCounters(Base):
+    """Счетчики для /api/v1/stats (одна строка, поддерживается триггерами)"""
+    __tablename__ = "stats_counters"
+
+    id = Column(Integer, primary_key=True)
+    users = Column(Integer, nullable=False, default=0)
+    students = Column(Integer, nullable=False, default=0)
+    employers = Column(Integer, nullable=False, default=0)
+    jobs = Column(Integer, nullable=False, default=0)  # только активные
+    applications = Column(Integer, nullable=False, default=0)
+    categories = Column(Integer, nullable=False, default=0)
+    departments = Column(Integer, nullable=False, default=0)
+    skills = Column(Integer, nullable=False, default=0)
+    notifications = Column(Integer, nullable=False, default=0)
+
+
+# Счетчик -> выражение для точного подсчета (используется при создании и сверке)
+STATS_COUNT_QUERIES = {
+    "users": "SELECT COUNT(*) FROM users",
+    "students": "SELECT COUNT(*) FROM student_profiles",
+    "employers": "SELECT COUNT(*) FROM employer_profiles",
+    "jobs": "SELECT COUNT(*) FROM jobs WHERE is_active = 1",
+    "applications": "SELECT COUNT(*) FROM applications",
+    "categories": "SELECT COUNT(*) FROM categories",
+    "departments": "SELECT COUNT(*) FROM departments",
+    "skills": "SELECT COUNT(*) FROM skills",
+    "notifications": "SELECT COUNT(*) FROM notifications",
+}
+
+STATS_COUNTED_TABLES = {
+    "users": "users",
+    "student_profiles": "students",
+    "employer_profiles": "employers",
+    "applications": "applications",
+    "categories": "categories",
+    "departments": "departments",
+    "skills": "skills",
+    "notifications": "notifications",
+}
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_stats_triggers(target, connection, **kw):
+    """Строка stats_counters с точными значениями и триггеры, обновляющие ее"""
+    if connection.dialect.name != "sqlite":
+        return
+
+    columns = ", ".join(STATS_COUNT_QUERIES)
+    counts = ", ".join(f"({query})" for query in STATS_COUNT_QUERIES.values())
+    connection.exec_driver_sql(f"INSERT OR IGNORE INTO stats_counters (id, {columns}) SELECT 1, {counts}")
+
+    for table_name, counter in STATS_COUNTED_TABLES.items():
+        connection.exec_driver_sql(f"""
+            CREATE TRIGGER IF NOT EXISTS {table_name}_stats_insert AFTER INSERT ON {table_name} BEGIN
+                UPDATE stats_counters SET {counter} = {counter} + 1 WHERE id = 1;
+            END
+        """)
+        connection.exec_driver_sql(f"""
+            CREATE TRIGGER IF NOT EXISTS {table_name}_stats_delete AFTER DELETE ON {table_name} BEGIN
+                UPDATE stats_counters SET {counter} = {counter} - 1 WHERE id = 1;
+            END
+        """)
+
+    # Вакансии считаются только активные: учитываем и смену is_active
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_insert AFTER INSERT ON jobs WHEN new.is_active = 1 BEGIN
+            UPDATE stats_counters SET jobs = jobs + 1 WHERE id = 1;
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_delete AFTER DELETE ON jobs WHEN old.is_active = 1 BEGIN
+            UPDATE stats_counters SET jobs = jobs - 1 WHERE id = 1;
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_update AFTER UPDATE OF is_active ON jobs
+        WHEN COALESCE(old.is_active = 1, 0) != COALESCE(new.is_active = 1, 0) BEGIN
+            UPDATE stats_counters SET jobs = jobs + COALESCE(new.is_active = 1, 0) - COALESCE(old.is_active = 1, 0)
+            WHERE id = 1;
+        END
+    """)
+
+
+def reconcile_stats(db) -> dict:
+    """Пересчитать stats_counters по таблицам, вернуть расхождения {счетчик: (было, стало)}
+
+    Пересчет - один INSERT OR REPLACE, поэтому конкурентная запись не может
+    вклиниться между подсчетом и сохранением.
+    """
+    counters = list(STATS_COUNT_QUERIES)
+    before = db.query(StatsCounters).filter(StatsCounters.id == 1).first()
+    before = {counter: getattr(before, counter) for counter in counters} if before else {}
+
+    columns = ", ".join(counters)
+    counts = ", ".join(f"({query})" for query in STATS_COUNT_QUERIES.values())
+    db.execute(text(f"INSERT OR REPLACE INTO stats_counters (id, {columns}) SELECT 1, {counts}"))
+    db.commit()
+
+    after = db.query(StatsCounters).filter(StatsCounters.id == 1).one()
+    return {
+        counter: (before.get(counter), getattr(after, counter))
+        for counter in counters
+        if before.get(counter) != getattr(after, counter)
+    }
+
+
+class CheckoutStats:
+    """Ожидание соединения писателя: число ожиданий, суммарное и максимальное время"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "wait_total_ms": round(self.total * 1000, 3),
+                "wait_avg_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+                "wait_max_ms": round(self.max * 1000, 3),
+            }
+
+
+writer_waits = CheckoutStats()
+
+
 def get_db():
-    """Dependency для получения сессии БД"""
+    """Dependency для получения сессии писателя (запись и чтение-перед-записью)"""
     db = SessionLocal()
     try:
+        started = time.perf_counter()
+        db.connection()
+        writer_waits.record(time.perf_counter() - started)
         yield db
     finally:
         db.close()
 
 
+def get_read_db():
+    """Dependency для сессии только для чтения (GET-эндпоинты)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def add_missing_columns(bind=engine):
+    """Добавить в существующие таблицы новые колонки моделей, вернуть {таблица: [колонки]}"""
+    inspector = inspect(bind)
+    added = {}
+
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                )
+                added.setdefault(table.name, []).append(column.name)
+
+    return added
+
+
+def backfill_salaries(bind=engine, batch_size=1000):
+    """Заполнить salary_min/salary_max/salary_period/currency для старых вакансий
+
+    Обрабатывает вакансии пачками по id, каждая пачка - отдельная транзакция,
+    поэтому долгая миграция не держит блокировку записи.
+    """
+    jobs = Job.__table__
+    set_parsed = (
+        update(jobs)
+        .where(jobs.c.id == bindparam("job_id"))
+        .values(
+            salary_min=bindparam("salary_min"),
+            salary_max=bindparam("salary_max"),
+            salary_period=bindparam("salary_period"),
+            currency=bindparam("currency")
+        )
+    )
+
+    last_id = 0
+    updated = 0
+    while True:
+        with bind.begin() as connection:
+            rows = connection.execute(
+                select(jobs.c.id, jobs.c.salary)
+                .where(jobs.c.id > last_id, jobs.c.salary.isnot(None))
+                .order_by(jobs.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            connection.execute(
+                set_parsed,
+                [{"job_id": row.id, **parse_salary(row.salary)} for row in rows]
+            )
+
+        last_id = rows[-1].id
+        updated += len(rows)
+
+    return updated
+
+
 def create_tables():
     """Создание всех таблиц в БД"""
     Base.metadata.create_all(bind=engine)
+
+    added = add_missing_columns()
+    if "salary_min" in added.get("jobs", []):
+        print(f"✅ Зарплата разобрана у {backfill_salaries()} вакансий")
+
+    # create_all не добавляет индексы к уже существующим таблицам
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
     print("✅ Таблицы БД созданы")
 
 
 def seed_initial_data(db):
     """Заполнение начальными данными"""
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
     statuses = [
         {"name": "pending", "description": "На рассмотрении"},
         {"name": "reviewed", "description": "Просмотрено"},
@@ -200,13 +657,7 @@ def seed_initial_data(db):
             status = ApplicationStatus(**status_data)
             db.add(status)
 
-    categories = [
-        {"name": "Преподавание", "description": "Работа ассистентом преподавателя"},
-        {"name": "Исследования", "description": "Научно-исследовательская работа"},
-        {"name": "Администрация", "description": "Административная работа"},
-        {"name": "IT", "description": "IT-специальности"},
-        {"name": "Библиотека", "description": "Работа в библиотеке"}
-    ]
+    categories = DEFAULT_CATEGORIES
 
     for category_data in categories:
         if not db.query(Category).filter_by(name=category_data["name"]).first():
@@ -0,0 +1,49 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from sqlalchemy import text
+
+
+class ReadinessProbe:
+    """Проверка соединения с БД с ограничением по времени и коротким кешем
+
+    Проверка выполняется в единственном фоновом потоке: если БД зависла,
+    следующие пробы ждут ту же проверку, а не занимают новые соединения.
+    """
+
+    def __init__(self, engine, timeout: float, cache_seconds: float):
+        self.engine = engine
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readyz")
+        self._lock = threading.Lock()
+        self._pending = None
+        self._result = None
+
+    def _ping(self):
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def check(self) -> dict:
+        """{"ready": bool, "error": str | None, "checked_at": float}"""
+        result = self._result
+        if result and time.monotonic() - result["checked_at"] < self.cache_seconds:
+            return result
+
+        with self._lock:
+            if self._pending is None or self._pending.done():
+                self._pending = self._executor.submit(self._ping)
+            pending = self._pending
+
+        try:
+            pending.result(timeout=self.timeout)
+            result = {"ready": True, "error": None}
+        except TimeoutError:
+            result = {"ready": False, "error": f"нет ответа за {self.timeout} с"}
+        except Exception as e:
+            result = {"ready": False, "error": str(e)}
+
+        result["checked_at"] = time.monotonic()
+        self._result = result
+        return result
@@ -0,0 +1,70 @@
+import re
+from typing import Optional
+
+
+CURRENCY_PATTERNS = [
+    ("RUB", re.compile(r"₽|руб|\bр\.|\brub\b|\brur\b", re.IGNORECASE)),
+    ("USD", re.compile(r"\$|\busd\b|долл", re.IGNORECASE)),
+    ("EUR", re.compile(r"€|\beur\b|евро", re.IGNORECASE)),
+]
+
+PERIOD_PATTERNS = [
+    ("hour", re.compile(r"/\s*ч|\bчас|в\s+час|\bhour|/\s*h\b", re.IGNORECASE)),
+    ("day", re.compile(r"/\s*д|\bдень|\bсмен|\bday", re.IGNORECASE)),
+    ("week", re.compile(r"/\s*нед|\bнедел|\bweek", re.IGNORECASE)),
+    ("month", re.compile(r"/\s*мес|\bмесяц|\bв\s+мес|\bmonth", re.IGNORECASE)),
+    ("year", re.compile(r"/\s*год|\bв\s+год|\bгод\b|\byear|\bannual", re.IGNORECASE)),
+]
+
+# Число с разделителями разрядов ("60 000", "60 000", "1,500") и множителем ("50k", "50 тыс.")
+NUMBER = re.compile(
+    r"(\d{1,3}(?:[   ,]\d{3})+|\d+(?:[.,]\d+)?)\s*(тыс\.?|k|к)?(?![\w])",
+    re.IGNORECASE
+)
+
+
+def _to_int(number: str, multiplier: Optional[str]) -> int:
+    number = re.sub(r"[   ]", "", number)
+    if re.fullmatch(r"\d{1,3}(,\d{3})+", number):
+        number = number.replace(",", "")
+    value = float(number.replace(",", "."))
+    if multiplier:
+        value *= 1000
+    return int(round(value))
+
+
+def parse_salary(text: Optional[str]) -> dict:
+    """Разбор текстовой зарплаты ("60 000 - 80 000 руб./мес.", "от 500 ₽/час")
+
+    Возвращает salary_min, salary_max, salary_period, currency; что не удалось
+    распознать - None. "от X" задает только минимум, "до Y" - только максимум.
+    """
+    result = {"salary_min": None, "salary_max": None, "salary_period": None, "currency": None}
+    if not text:
+        return result
+
+    values = [_to_int(number, multiplier) for number, multiplier in NUMBER.findall(text)][:2]
+    if not values:
+        return result
+
+    lowered = text.lower()
+    if len(values) == 2:
+        result["salary_min"], result["salary_max"] = sorted(values)
+    elif re.search(r"(^|\s)до\s", lowered) and not re.search(r"(^|\s)от\s", lowered):
+        result["salary_max"] = values[0]
+    elif re.search(r"(^|\s)от\s", lowered):
+        result["salary_min"] = values[0]
+    else:
+        result["salary_min"] = result["salary_max"] = values[0]
+
+    for currency, pattern in CURRENCY_PATTERNS:
+        if pattern.search(text):
+            result["currency"] = currency
+            break
+
+    for period, pattern in PERIOD_PATTERNS:
+        if pattern.search(text):
+            result["salary_period"] = period
+            break
+
+    return result
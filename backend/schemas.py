@@ -53,11 +53,25 @@ class JobResponse(JobBase):
     is_active: bool
     created_at: datetime
     employer_id: Optional[int] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_period: Optional[str] = None
+    currency: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class JobPage(BaseModel):
+    items: List[JobResponse]
+    next_cursor: Optional[str] = None
+
+
+class JobSearchResult(JobResponse):
+    score: float
+    snippet: Optional[str] = None
+
+
 class JobDetailResponse(JobResponse):
     category: Optional[dict] = None
     department: Optional[dict] = None
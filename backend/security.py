@@ -0,0 +1,103 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from backend import config
+
+
+# Единственный контекст хеширования. plaintext оставлен только для проверки
+# старых записей: он помечен устаревшим, такие пароли перехешируются при входе.
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256", "plaintext"],
+    deprecated="auto",
+    pbkdf2_sha256__rounds=config.PASSWORD_HASH_ROUNDS
+)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(password, hashed)
+    except ValueError:
+        # Хеш неизвестного формата
+        return False, None
+
+
+class HashingPool:
+    """Пул процессов для PBKDF2 с ограничением числа ожидающих операций
+
+    Хеширование не занимает общий пул потоков FastAPI и не держит GIL
+    основного процесса. Если в очереди уже max_pending операций, новые
+    запросы сразу получают 503 вместо бесконечного ожидания.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    @contextmanager
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Сервер перегружен, повторите попытку позже",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def run(self, func, *args):
+        with self._admit():
+            if self.workers <= 0:
+                return await run_in_threadpool(func, *args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+hashing_pool = HashingPool(workers=config.HASH_POOL_WORKERS, max_pending=config.HASH_POOL_MAX_PENDING)
+
+
+async def hash_password(password: str) -> str:
+    return await hashing_pool.run(_hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Проверка пароля; второй элемент - новый хеш, если параметры хеширования изменились"""
+    return await hashing_pool.run(_verify_and_update, password, hashed)
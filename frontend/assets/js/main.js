@@ -187,6 +187,7 @@ async function loadJobs(categoryId = '', jobType = '') {
     try {
         let url = `${API_BASE_URL}/api/v1/jobs?limit=20`;
         if (categoryId) url += `&category_id=${categoryId}`;
+        if (jobType) url += `&job_type=${encodeURIComponent(jobType)}`;
         
         const response = await fetch(url);
         
@@ -197,37 +198,21 @@ async function loadJobs(categoryId = '', jobType = '') {
         const jobs = await response.json();
         
         if (jobs.length === 0) {
+            const filtered = categoryId || jobType;
             container.innerHTML = `
                 <div class="col-12">
-                    <div class="alert alert-info">
-                        <i class="bi bi-info-circle me-2"></i>
-                        Пока нет доступных вакансий. Попробуйте позже.
+                    <div class="alert ${filtered ? 'alert-warning' : 'alert-info'}">
+                        <i class="bi ${filtered ? 'bi-exclamation-triangle' : 'bi-info-circle'} me-2"></i>
+                        ${filtered ? 'Нет вакансий по выбранным фильтрам.' : 'Пока нет доступных вакансий. Попробуйте позже.'}
                     </div>
                 </div>
             `;
             return;
         }
 
-        let filteredJobs = jobs;
-        if (jobType) {
-            filteredJobs = jobs.filter(job => job.job_type === jobType);
-        }
-
         container.innerHTML = '';
         
-        if (filteredJobs.length === 0) {
-            container.innerHTML = `
-                <div class="col-12">
-                    <div class="alert alert-warning">
-                        <i class="bi bi-exclamation-triangle me-2"></i>
-                        Нет вакансий по выбранным фильтрам.
-                    </div>
-                </div>
-            `;
-            return;
-        }
-        
-        filteredJobs.forEach(job => {
+        jobs.forEach(job => {
             const jobCard = createJobCard(job);
             container.appendChild(jobCard);
         });
@@ -371,6 +356,7 @@ async function applyForJob() {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
+                'Authorization': `Bearer ${getFromStorage('token')}`,
             },
             body: JSON.stringify({
                 job_id: currentJobId,
@@ -388,6 +374,9 @@ async function applyForJob() {
 
             updateApplicationsCount();
 
+        } else if (response.status === 401) {
+            showMessage('warning', 'Сессия истекла, войдите снова');
+            logout();
         } else {
             showMessage('error', data.detail || 'Ошибка при подаче заявки');
         }
@@ -412,15 +401,13 @@ async function loadUserApplications() {
     }
 
     try {
-        const response = await fetch(`${API_BASE_URL}/api/v1/applications`);
+        const response = await fetch(`${API_BASE_URL}/api/v1/applications?user_id=${currentUser.id}`);
 
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const applications = await response.json();
-
-        const userApplications = applications.filter(app => app.user_id === currentUser.id);
+        const userApplications = await response.json();
 
         if (userApplications.length === 0) {
             container.innerHTML = `
@@ -0,0 +1,133 @@
+"""Микробенчмарк входа: пропускная способность логина и задержка ленты вакансий
+
+Запуск из корня проекта:
+    python -m tests.bench.bench_login --workers 0 1 2 4 --logins 200
+
+workers=0 - хеширование в общем пуле потоков (как было до пула процессов).
+Во время серии логинов параллельно замеряется задержка GET /api/v1/jobs:
+с пулом процессов она должна оставаться на уровне холостого хода, а число
+логинов в секунду - расти вместе с числом ядер.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import security
+from backend.app import app
+from backend.database import Base, Job, User, get_db, get_read_db
+
+
+def setup_database(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with session_factory() as db:
+        db.add(User(
+            email="bench@university.edu",
+            hashed_password=security.pwd_context.hash("bench123"),
+            full_name="Нагрузочный тест",
+            user_type="student"
+        ))
+        db.add_all(Job(title=f"Вакансия {i}", description="Описание") for i in range(200))
+        db.commit()
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    return engine
+
+
+async def measure_listing(client, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/api/v1/jobs", params={"limit": 20})
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def run(workers, logins, concurrency):
+    security.hashing_pool.shutdown()
+    security.hashing_pool = security.HashingPool(workers=workers, max_pending=logins)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Прогрев: запуск процессов пула и первый запрос к БД
+        await client.post("/api/v1/auth/login", json={"email": "bench@university.edu", "password": "bench123"})
+
+        idle = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(measure_listing(client, stop, idle))
+        await asyncio.sleep(0.5)
+        stop.set()
+        await probe
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": "bench@university.edu", "password": "bench123"}
+                )
+                assert response.status_code == 200, response.text
+
+        loaded = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(measure_listing(client, stop, loaded))
+        started = time.perf_counter()
+        await asyncio.gather(*(one_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    security.hashing_pool.shutdown()
+    return {
+        "workers": workers,
+        "logins_per_sec": logins / elapsed,
+        "jobs_p50_idle": statistics.median(idle),
+        "jobs_p50_login_burst": statistics.median(loaded) if loaded else float("nan"),
+        "jobs_p95_login_burst": statistics.quantiles(loaded, n=20)[-1] if len(loaded) > 1 else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, os.cpu_count() or 1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = setup_database(os.path.join(directory, "bench.db"))
+        print(f"Ядер: {os.cpu_count()}, логинов: {args.logins}, одновременно: {args.concurrency}")
+        print(f"{'workers':>8} {'логинов/с':>10} {'jobs p50 idle, мс':>18} {'jobs p50, мс':>13} {'jobs p95, мс':>13}")
+        for workers in args.workers:
+            result = asyncio.run(run(workers, args.logins, args.concurrency))
+            print(
+                f"{result['workers']:>8} {result['logins_per_sec']:>10.1f} {result['jobs_p50_idle']:>18.2f} "
+                f"{result['jobs_p50_login_burst']:>13.2f} {result['jobs_p95_login_burst']:>13.2f}"
+            )
+        engine.dispose()
+
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Конкурентные чтения и записи SQLite: профиль по умолчанию против WAL-профиля
+
+Запуск из корня проекта:
+    python -m tests.bench.bench_sqlite_concurrency --readers 8 --writers 2 --seconds 5
+
+Читатели листают ленту вакансий и заявки (как GET /api/v1/jobs и
+/api/v1/applications), писатели создают заявки. Для каждого профиля выводится
+число операций в секунду и число ошибок "database is locked".
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import crud
+from backend.database import Application, Base, Job, User, make_engine
+
+
+PROFILES = {
+    # Как было до профиля: журнал отката, стандартный кеш, без mmap
+    "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+    "wal": lambda url: make_engine(url),
+}
+
+
+def populate(engine, jobs, users):
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all(
+            User(email=f"user{i}@university.edu", hashed_password="-", full_name=f"Студент {i}", user_type="student")
+            for i in range(users)
+        )
+        db.add_all(Job(title=f"Вакансия {i}", description="Описание") for i in range(jobs))
+        db.commit()
+
+
+def reader(session_factory, stop, counters, users):
+    rng = random.Random()
+    while not stop.is_set():
+        try:
+            with session_factory() as db:
+                crud.query_jobs(db).limit(20).all()
+                crud.query_applications(db, user_id=rng.randint(1, users)).limit(20).all()
+            counters["reads"] += 1
+        except OperationalError:
+            counters["locked"] += 1
+
+
+def writer(session_factory, stop, counters, jobs, users):
+    rng = random.Random()
+    while not stop.is_set():
+        try:
+            with session_factory() as db:
+                db.add(Application(user_id=rng.randint(1, users), job_id=rng.randint(1, jobs), status="pending"))
+                db.commit()
+            counters["writes"] += 1
+        except OperationalError:
+            counters["locked"] += 1
+
+
+def run(profile, args):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = PROFILES[profile](f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.jobs, args.users)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        stop = threading.Event()
+        reader_counters = [{"reads": 0, "writes": 0, "locked": 0} for _ in range(args.readers)]
+        writer_counters = [{"reads": 0, "writes": 0, "locked": 0} for _ in range(args.writers)]
+        threads = [
+            threading.Thread(target=reader, args=(session_factory, stop, counters, args.users))
+            for counters in reader_counters
+        ] + [
+            threading.Thread(target=writer, args=(session_factory, stop, counters, args.jobs, args.users))
+            for counters in writer_counters
+        ]
+
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    total = {key: sum(c[key] for c in reader_counters + writer_counters) for key in ("reads", "writes", "locked")}
+    return {
+        "profile": profile,
+        "reads_per_sec": total["reads"] / args.seconds,
+        "writes_per_sec": total["writes"] / args.seconds,
+        "locked": total["locked"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Читателей: {args.readers}, писателей: {args.writers}, {args.seconds:g} с на профиль")
+    print(f"{'профиль':>8} {'чтений/с':>10} {'записей/с':>10} {'locked':>8}")
+    for profile in args.profiles:
+        result = run(profile, args)
+        print(
+            f"{result['profile']:>8} {result['reads_per_sec']:>10.1f} "
+            f"{result['writes_per_sec']:>10.1f} {result['locked']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
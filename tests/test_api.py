@@ -1,4 +1,16 @@
+import datetime
+import threading
+import time
+
+import pytest
 from fastapi import status
+from sqlalchemy import text
+
+from backend import auth, config, crud, security
+from backend.health import ReadinessProbe
+from backend.database import (
+    Application, Category, Department, EmployerProfile, Job, Skill, StatsCounters, User, backfill_salaries
+)
 
 
 def test_api_health(client):
@@ -9,11 +21,12 @@ def test_api_health(client):
     data = response.json()
 
     assert data["status"] == "ok"
-    assert "database" in data
-    assert "counts" in data
+    assert data["database"] == "connected"
     assert "timestamp" in data
 
-    counts = data["counts"]
+    response = client.get("/api/v1/health/diagnostics")
+    assert response.status_code == status.HTTP_200_OK
+    counts = response.json()["counts"]
     assert "jobs" in counts
     assert "users" in counts
     assert isinstance(counts["jobs"], int)
@@ -166,4 +179,478 @@ def test_system_stats(client, db_session):
         if field in stats:
             assert isinstance(stats[field], (int, str))
 
-    print("✅ Дополнительный тест пройден: статистика системы работает")
\ No newline at end of file
+    print("✅ Дополнительный тест пройден: статистика системы работает")
+
+def _query_plan(db_session, query):
+    """EXPLAIN QUERY PLAN для ORM-запроса"""
+    statement = query.statement.compile(
+        dialect=db_session.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = db_session.execute(text(f"EXPLAIN QUERY PLAN {statement}")).fetchall()
+    return [row[-1] for row in rows]
+
+
+def test_get_jobs_cursor_pagination(client, db_session):
+    """Курсорная пагинация: все вакансии без пропусков и повторов"""
+    for i in range(5):
+        db_session.add(Job(title=f"Вакансия {i}", description="Описание", is_active=True))
+    db_session.commit()
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get("/api/v1/jobs", params={"limit": 2, "cursor": cursor})
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(job["id"] for job in page["items"])
+        cursor = page["next_cursor"]
+
+    assert sorted(seen) == sorted(job.id for job in db_session.query(Job).all())
+    assert len(seen) == len(set(seen))
+
+    response = client.get("/api/v1/jobs", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_jobs_cursor_uses_index(db_session):
+    """Страница по курсору читается из индекса, без сортировки и полного сканирования"""
+    query = crud.jobs_after(crud.query_jobs(db_session), "2024-01-01 00:00:00", 10).limit(20)
+    plan = _query_plan(db_session, query)
+
+    assert any("ix_jobs_active_created_id" in step for step in plan)
+    assert not any(step.startswith("USE TEMP B-TREE") for step in plan)
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"active_only": False},
+    {"category_id": 1},
+    {"job_type": "internship"},
+    {"department_id": 1},
+    {"employer_id": 1},
+    {"skill_ids": [1, 2]},
+    {"skill_ids": [1, 2], "skill_match": "all"},
+    {"deadline_after": datetime.datetime(2024, 1, 1)},
+    {"job_type": "part_time", "department_id": 1, "skill_ids": [1]},
+    {"salary_min": 50000},
+    {"salary_max": 90000},
+    {"sort": "salary"},
+    {"salary_min": 50000, "sort": "salary"},
+])
+def test_jobs_filters_use_index(db_session, filters):
+    """Каждая комбинация фильтров ленты читает jobs через индекс"""
+    plan = _query_plan(db_session, crud.query_jobs(db_session, **filters).limit(20))
+
+    assert "SCAN jobs" not in plan
+    assert "SCAN job_skill" not in plan
+    assert any(step.startswith("SEARCH jobs USING") or step.startswith("SCAN jobs USING") for step in plan)
+
+
+def test_get_jobs_server_side_filters(client, db_session):
+    """Фильтры job_type, department_id, skill_id и deadline_after применяются на сервере"""
+    python, sql = Skill(name="Python"), Skill(name="SQL")
+    department = Department(name="Кафедра ИТ")
+    db_session.add_all([python, sql, department])
+    db_session.flush()
+
+    now = datetime.datetime.now()
+    both = Job(title="Аналитик", description="-", job_type="part_time", department_id=department.id,
+               deadline=now + datetime.timedelta(days=10), skills=[python, sql])
+    only_python = Job(title="Ассистент", description="-", job_type="internship",
+                      deadline=now - datetime.timedelta(days=1), skills=[python])
+    db_session.add_all([both, only_python])
+    db_session.commit()
+
+    def ids(**params):
+        response = client.get("/api/v1/jobs", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        return {job["id"] for job in response.json()}
+
+    assert ids(job_type="internship") == {only_python.id}
+    assert ids(department_id=department.id) == {both.id}
+    assert ids(skill_id=[python.id, sql.id]) == {both.id, only_python.id}
+    assert ids(skill_id=[python.id, sql.id], skill_match="all") == {both.id}
+    assert ids(deadline_after=now.isoformat()) == {both.id}
+
+
+def test_search_jobs(client, db_session):
+    """Полнотекстовый поиск: префиксы, ранжирование, подсветка и обновление индекса"""
+    teacher = Job(title="Ассистент преподавателя", description="Помощь на лабораторных по Python")
+    library = Job(title="Библиотекарь", description="Выдача книг", requirements="Внимательность, Python")
+    db_session.add_all([teacher, library])
+    db_session.commit()
+
+    response = client.get("/api/v1/jobs/search", params={"q": "ассист"})
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert [job["id"] for job in results] == [teacher.id]
+    assert "<mark>" in results[0]["snippet"]
+
+    results = client.get("/api/v1/jobs/search", params={"q": "python"}).json()
+    assert {job["id"] for job in results} == {teacher.id, library.id}
+    assert results[0]["score"] >= results[1]["score"]
+
+    library.title = "Ассистент библиотекаря"
+    db_session.commit()
+    results = client.get("/api/v1/jobs/search", params={"q": "ассист библ"}).json()
+    assert [job["id"] for job in results] == [library.id]
+
+    assert client.get("/api/v1/jobs/search", params={"q": '"*)'}).json() == []
+
+
+def test_get_jobs_salary_filters_and_sort(client, db_session):
+    """Зарплата разбирается при создании вакансии, фильтры и сортировка по ней"""
+    response = client.post("/api/v1/jobs", json={
+        "title": "Лаборант", "description": "-", "salary": "40 000 - 55 000 руб./мес."
+    })
+    assert response.status_code == status.HTTP_200_OK
+    created = response.json()
+    assert (created["salary_min"], created["salary_max"]) == (40000, 55000)
+    assert (created["salary_period"], created["currency"]) == ("month", "RUB")
+
+    db_session.add_all([
+        Job(title="Ассистент", description="-", salary="90000 руб./мес."),
+        Job(title="Волонтер", description="-", salary="по договоренности"),
+    ])
+    db_session.commit()
+
+    jobs = client.get("/api/v1/jobs", params={"salary_min": 45000}).json()
+    assert [job["title"] for job in jobs] == ["Ассистент"]
+
+    jobs = client.get("/api/v1/jobs", params={"salary_max": 60000}).json()
+    assert [job["title"] for job in jobs] == ["Лаборант"]
+
+    page = client.get("/api/v1/jobs", params={"sort": "salary", "limit": 1, "cursor": ""}).json()
+    assert [job["title"] for job in page["items"]] == ["Ассистент"]
+    page = client.get("/api/v1/jobs", params={"sort": "salary", "limit": 1, "cursor": page["next_cursor"]}).json()
+    assert [job["title"] for job in page["items"]] == ["Лаборант"]
+    assert page["next_cursor"] is None
+
+
+def test_backfill_salaries(db_session):
+    """Пакетное заполнение разобранной зарплаты для существующих вакансий"""
+    db_session.execute(Job.__table__.insert(), [
+        {"title": f"Вакансия {i}", "description": "-", "salary": f"{i} 000 руб./час"} for i in range(1, 6)
+    ])
+    db_session.commit()
+
+    assert backfill_salaries(db_session.get_bind(), batch_size=2) == 5
+    db_session.expire_all()
+    assert sorted(job.salary_min for job in db_session.query(Job).all()) == [1000, 2000, 3000, 4000, 5000]
+    assert {job.salary_period for job in db_session.query(Job).all()} == {"hour"}
+
+
+def _create_job_graph(db_session, count):
+    department = Department(name="Кафедра ИТ")
+    category = Category(name="Лаборатории")
+    skills = [Skill(name="Python"), Skill(name="SQL")]
+    employer = EmployerProfile(
+        user=User(email="boss@university.edu", hashed_password="-", full_name="Петр Петров", user_type="employer"),
+        department=department
+    )
+    jobs = [
+        Job(title=f"Вакансия {i}", description="-", category=category, department=department,
+            employer=employer, skills=skills)
+        for i in range(count)
+    ]
+    db_session.add_all(jobs)
+    db_session.commit()
+    return [job.id for job in jobs]
+
+
+def test_job_details_constant_query_count(client, db_session, sql_statements):
+    """Карточка и пакет карточек вакансий загружаются фиксированным числом запросов"""
+    job_ids = _create_job_graph(db_session, 5)
+    db_session.expire_all()
+
+    sql_statements.clear()
+    response = client.get(f"/api/v1/jobs/{job_ids[0]}")
+    assert response.status_code == status.HTTP_200_OK
+    job = response.json()
+    assert job["employer"]["name"] == "Петр Петров"
+    assert {skill["name"] for skill in job["skills"]} == {"Python", "SQL"}
+    # table_versions (ETag) + вакансия со связями + навыки
+    assert len(sql_statements) <= 3
+
+    counts = []
+    for ids in (job_ids[:1], job_ids):
+        db_session.expire_all()
+        sql_statements.clear()
+        response = client.get("/api/v1/jobs/details", params={"ids": ",".join(map(str, ids))})
+        assert response.status_code == status.HTTP_200_OK
+        assert [job["id"] for job in response.json()] == ids
+        assert all(job["category"]["name"] == "Лаборатории" for job in response.json())
+        counts.append(len(sql_statements))
+
+    assert counts[0] == counts[1] <= 3
+
+    response = client.get("/api/v1/jobs/details", params={"ids": "1,x"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_conditional_get_job(client, db_session, sql_statements):
+    """ETag/Last-Modified у карточки вакансии: 304 без загрузки вакансии"""
+    job_id = _create_job_graph(db_session, 1)[0]
+
+    response = client.get(f"/api/v1/jobs/{job_id}")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+    assert "last-modified" in response.headers
+
+    sql_statements.clear()
+    response = client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert len(sql_statements) == 1 and "table_versions" in sql_statements[0]
+
+    response = client.get(f"/api/v1/jobs/{job_id}", headers={"If-Modified-Since": response.headers["last-modified"]})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    db_session.query(Job).filter(Job.id == job_id).update({"title": "Новое название"})
+    db_session.commit()
+
+    response = client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Новое название"
+    assert response.headers["etag"] != etag
+
+
+def test_conditional_get_lists(client, db_session):
+    """ETag ленты зависит от параметров запроса и меняется при новых вакансиях"""
+    response = client.get("/api/v1/jobs", params={"limit": 5})
+    etag = response.headers["etag"]
+
+    assert client.get("/api/v1/jobs", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/jobs", params={"limit": 6}, headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/api/v1/jobs", json={"title": "Новая", "description": "-"})
+    assert client.get("/api/v1/jobs", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 200
+
+    etag = client.get("/api/v1/departments").headers["etag"]
+    assert client.get("/api/v1/departments", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_reference_cache(client, db_session, sql_statements):
+    """Справочники отдаются из кеша без запросов к БД и сбрасываются при записи"""
+    response = client.get("/api/v1/skills")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert "max-age" in response.headers["cache-control"]
+
+    sql_statements.clear()
+    assert client.get("/api/v1/skills").json() == []
+    assert sql_statements == []
+
+    db_session.add(Skill(name="Python"))
+    db_session.commit()
+
+    assert [skill["name"] for skill in client.get("/api/v1/skills").json()] == ["Python"]
+
+
+def test_get_applications_filters_and_cursor(client, db_session, sql_statements):
+    """Заявки одного студента постранично, вакансия и пользователь без N+1"""
+    job_ids = _create_job_graph(db_session, 3)
+    students = [
+        User(email=f"student{i}@university.edu", hashed_password="-", full_name=f"Студент {i}", user_type="student")
+        for i in range(2)
+    ]
+    db_session.add_all(students)
+    db_session.flush()
+    for job_id in job_ids:
+        for student in students:
+            db_session.add(Application(user_id=student.id, job_id=job_id, status="pending"))
+    db_session.commit()
+    student_ids = [student.id for student in students]
+    db_session.expire_all()
+
+    sql_statements.clear()
+    applications = client.get("/api/v1/applications", params={"user_id": student_ids[0]}).json()
+    assert len(applications) == 3
+    assert {application["user"]["email"] for application in applications} == {"student0@university.edu"}
+    assert all(application["job"]["title"].startswith("Вакансия") for application in applications)
+    assert len(sql_statements) == 1
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = client.get("/api/v1/applications", params={"user_id": student_ids[1], "limit": 2, "cursor": cursor}).json()
+        seen.extend(application["id"] for application in page["items"])
+        cursor = page["next_cursor"]
+    assert len(seen) == len(set(seen)) == 3
+
+    assert len(client.get("/api/v1/applications", params={"job_id": job_ids[0], "status": "pending"}).json()) == 2
+    assert client.get("/api/v1/applications", params={"status": "accepted"}).json() == []
+
+
+def test_applications_listing_uses_index(db_session):
+    """Личный кабинет студента читает заявки по индексу без сортировки"""
+    query = crud.applications_after(crud.query_applications(db_session, user_id=1), "2024-01-01 00:00:00", 10)
+    plan = _query_plan(db_session, query.limit(20))
+
+    assert any("ix_applications_user_created" in step for step in plan)
+    assert not any(step.startswith("USE TEMP B-TREE") for step in plan)
+
+
+def test_stats_counters(client, db_session):
+    """Счетчики статистики ведут триггеры, сверка исправляет расхождения"""
+    _create_job_graph(db_session, 3)
+    inactive = Job(title="Архив", description="-", is_active=False)
+    db_session.add(inactive)
+    db_session.commit()
+
+    stats = client.get("/api/v1/stats").json()
+    assert (stats["jobs"], stats["users"], stats["employers"], stats["skills"]) == (3, 1, 1, 2)
+    assert stats["categories"] == db_session.query(Category).count()
+
+    inactive.is_active = True
+    db_session.query(Skill).filter(Skill.name == "SQL").delete()
+    db_session.commit()
+    counters = db_session.query(StatsCounters).one()
+    assert (counters.jobs, counters.skills) == (4, 1)
+
+    counters.users = 100
+    db_session.commit()
+    response = client.post("/api/v1/admin/stats/reconcile")
+    assert response.json()["drift"] == {"users": {"stored": 100, "actual": 1}}
+    assert client.get("/api/v1/stats").json()["users"] == 1
+
+
+def test_liveness_and_readiness(client, sql_statements):
+    """/livez не обращается к БД, /readyz проверяет соединение"""
+    response = client.get("/livez")
+    assert response.status_code == status.HTTP_200_OK
+    assert sql_statements == []
+
+    response = client.get("/readyz")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ok"}
+
+
+def test_readiness_probe_timeout():
+    """Зависшая проверка БД не блокирует пробу дольше timeout"""
+    release = threading.Event()
+    probe = ReadinessProbe(engine=None, timeout=0.05, cache_seconds=0)
+    probe._ping = lambda: release.wait(5)
+
+    started = time.monotonic()
+    result = probe.check()
+    assert not result["ready"]
+    assert time.monotonic() - started < 1
+
+    release.set()
+
+
+def test_login_rehashes_outdated_password(client, db_session):
+    """Пароль со старыми параметрами хеширования пересчитывается при входе"""
+    user = User(email="legacy@university.edu", hashed_password="legacy123", full_name="Старый", user_type="student")
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post("/api/v1/auth/login", json={"email": "legacy@university.edu", "password": "legacy123"})
+    assert response.status_code == status.HTTP_200_OK
+
+    hashed_password = db_session.query(User.hashed_password).filter(User.email == "legacy@university.edu").scalar()
+    assert hashed_password.startswith("$pbkdf2-sha256$")
+    assert not security.pwd_context.needs_update(hashed_password)
+
+    response = client.post("/api/v1/auth/login", json={"email": "legacy@university.edu", "password": "wrong"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_hashing_pool_admission_limit(client, monkeypatch):
+    """Сверх предела ожидающих операций хеширования сервер отвечает 503"""
+    monkeypatch.setattr(security, "hashing_pool", security.HashingPool(workers=0, max_pending=0))
+
+    response = client.post("/api/v1/auth/login", json={"email": "nobody@university.edu", "password": "x"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = client.post("/api/v1/auth/register", json={
+        "email": "new@university.edu", "password": "secret123", "full_name": "Новый", "user_type": "student"
+    })
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "1"
+
+
+def _student_token(db_session, email="token@university.edu"):
+    user = User(email=email, hashed_password="x", full_name="Студент", user_type="student")
+    db_session.add(user)
+    db_session.commit()
+    return user, auth.create_access_token(user.id, user.user_type)
+
+
+def test_create_application_with_signed_token(client, db_session, sql_statements):
+    """Заявка создается от имени пользователя из подписанного токена"""
+    job_id = _create_job_graph(db_session, 1)[0]
+    user, token = _student_token(db_session)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/api/v1/applications", json={"job_id": job_id})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = client.post("/api/v1/applications", json={"job_id": job_id}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["user_id"] == user.id
+
+    # Повторный запрос берет пользователя из кеша, а не из users
+    sql_statements.clear()
+    response = client.post("/api/v1/applications", json={"job_id": job_id}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert not any("FROM users" in statement for statement in sql_statements)
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda token: token[:-2] + ("AA" if not token.endswith("AA") else "BB"),
+    lambda token: "demo-token-1",
+    lambda token: "",
+])
+def test_rejects_invalid_token(client, db_session, mangle):
+    """Поддельные и испорченные токены отклоняются"""
+    job_id = _create_job_graph(db_session, 1)[0]
+    _, token = _student_token(db_session)
+
+    response = client.post(
+        "/api/v1/applications", json={"job_id": job_id}, headers={"Authorization": f"Bearer {mangle(token)}"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_rejects_expired_token(client, db_session):
+    job_id = _create_job_graph(db_session, 1)[0]
+    user, _ = _student_token(db_session)
+    token = auth.create_access_token(user.id, user.user_type, ttl=-1)
+
+    response = client.post("/api/v1/applications", json={"job_id": job_id}, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_deactivation_invalidates_principal(client, db_session):
+    """Деактивация пользователя сразу сбрасывает его из кеша"""
+    job_id = _create_job_graph(db_session, 1)[0]
+    user, token = _student_token(db_session)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post("/api/v1/applications", json={"job_id": job_id}, headers=headers).status_code == 200
+
+    user.is_active = False
+    db_session.commit()
+
+    response = client.post("/api/v1/applications", json={"job_id": job_id}, headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_login_returns_signed_token(client, db_session):
+    client.post("/api/v1/auth/register", json={
+        "email": "signed@university.edu", "password": "secret123", "full_name": "Подпись", "user_type": "student"
+    })
+    response = client.post("/api/v1/auth/login", json={"email": "signed@university.edu", "password": "secret123"})
+    payload = auth.decode_access_token(response.json()["access_token"])
+    assert payload["sub"] == response.json()["user"]["id"]
+    assert payload["typ"] == "student"
+
+
+def test_sqlite_engine_profile(db_session):
+    """Каждое соединение получает профиль SQLite из конфигурации"""
+    assert db_session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    assert db_session.execute(text("PRAGMA synchronous")).scalar() == 1
+    assert db_session.execute(text("PRAGMA temp_store")).scalar() == 2
+    assert db_session.execute(text("PRAGMA busy_timeout")).scalar() == config.SQLITE_BUSY_TIMEOUT_MS